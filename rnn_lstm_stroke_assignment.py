@@ -15,6 +15,135 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+# Artifact Writer
+#
+# ARTIFACT_MODE (set with the ARTIFACT_MODE environment variable):
+# 1) 'inline' (default): figures are rendered and shown right away and frames/arrays are displayed, as in the notebook
+# 2) 'background': figures are sent as plot specs through a queue to a separate process which renders them with the
+# non-interactive 'Agg' backend and writes them, with metrics and history JSON, into RUN_DIR. Nothing is displayed,
+# so headless batch runs do not block on rendering or spend time formatting output
+# 3) 'off': nothing is rendered, displayed or written
+# Any other value raises an error, so a typo does not silently turn into 'off'
+#
+# A figure or JSON which fails in the background process is skipped and logged into RUN_DIR/errors.json,
+# the rest of the artifacts are still written
+#
+# Plot spec (dict):
+# 1) name: file name of the figure (without .png)
+# 2) figsize, nrows, ncols: same as plt.subplots, delete: list of (row, col) subplots to delete
+# 3) data: frame used by all seaborn panels
+# 4) panels: list of {'ax': (row, col), 'plot': seaborn function name or 'line', 'kwargs': arguments of the plot,
+# 'lines': list of {'x', 'y', other plt.plot arguments} when plot is 'line', 'title', 'xlabel', 'ylabel', 'legend'}
+#
+# (VERY IMPORTANT: the writer is started here, before TensorFlow is imported, because the background process
+# is forked from this process)
+import os
+import json
+import time
+import multiprocessing
+
+ARTIFACT_MODES = ['inline', 'background', 'off']
+ARTIFACT_MODE = os.environ.get('ARTIFACT_MODE', 'inline')
+RUN_DIR = os.path.join('runs', time.strftime('%Y%m%d-%H%M%S'))
+
+def render_figure(spec):
+  fig, axes = plt.subplots(nrows = spec.get('nrows', 1), ncols = spec.get('ncols', 1), figsize = spec['figsize'],
+                           squeeze = False)
+  for position in spec.get('delete', []):
+    fig.delaxes(ax = axes[position])
+
+  for panel in spec['panels']:
+    ax = axes[panel.get('ax', (0, 0))]
+    if panel['plot'] == 'line':
+      for line in panel['lines']:
+        line = line.copy()
+        ax.plot(line.pop('x'), line.pop('y'), **line)
+    else:
+      kwargs = {'data': spec.get('data'), **panel.get('kwargs', {})}
+      getattr(sns, panel['plot'])(ax = ax, **kwargs)
+    ax.set_title(panel.get('title', ''))
+    if 'xlabel' in panel:
+      ax.set_xlabel(panel['xlabel'])
+    if 'ylabel' in panel:
+      ax.set_ylabel(panel['ylabel'])
+    if panel.get('legend'):
+      ax.legend(loc = panel.get('legend_loc', 'best'))
+  return fig
+
+def to_json(obj):
+  return obj.tolist() if hasattr(obj, 'tolist') else str(obj)
+
+def artifact_worker(queue, run_dir):
+  plt.switch_backend('Agg')
+  errors = []
+  while True:
+    item = queue.get()
+    if item is None:
+      break
+    kind, name, payload = item
+    try:
+      if kind == 'figure':
+        fig = render_figure(payload)
+        fig.savefig(os.path.join(run_dir, name + '.png'), bbox_inches = 'tight')
+      else:
+        with open(os.path.join(run_dir, name + '.json'), 'w') as f:
+          json.dump(payload, f, indent = 2, default = to_json)
+    except Exception as e:
+      errors.append({'kind': kind, 'name': name, 'error': repr(e)})
+      with open(os.path.join(run_dir, 'errors.json'), 'w') as f:
+        json.dump(errors, f, indent = 2)
+    finally:
+      plt.close('all')
+
+class ArtifactWriter:
+  def __init__(self, mode, run_dir):
+    if mode not in ARTIFACT_MODES:
+      raise ValueError('ARTIFACT_MODE must be one of %s, got %r' % (ARTIFACT_MODES, mode))
+    self.mode = mode
+    self.run_dir = run_dir
+    if mode == 'background':
+      os.makedirs(run_dir, exist_ok = True)
+      context = multiprocessing.get_context('fork')
+      self.queue = context.Queue()
+      self.process = context.Process(target = artifact_worker, args = (self.queue, run_dir), daemon = True)
+      self.process.start()
+
+  def figure(self, spec):
+    if self.mode == 'inline':
+      render_figure(spec)
+      plt.show()
+    elif self.mode == 'background':
+      self.queue.put(('figure', spec['name'], spec))
+
+  def show(self, obj):
+    # Frames, arrays and reports are only formatted when someone is looking at them
+    if self.mode == 'inline':
+      if isinstance(obj, str):
+        print(obj)
+      else:
+        display(obj)
+
+  def write_json(self, name, payload):
+    if self.mode == 'background':
+      self.queue.put(('json', name, payload))
+
+  def metrics(self, name, payload):
+    self.show(pd.Series(payload, name = name))
+    self.write_json(name, payload)
+
+  def close(self):
+    if self.mode == 'background':
+      if self.process.is_alive():
+        self.queue.put(None)
+        self.process.join()
+      if self.process.exitcode != 0:
+        # Nobody reads the queue anymore, so do not block the exit on pushing the remaining artifacts into it
+        self.queue.cancel_join_thread()
+        print('Artifact writer stopped with exit code', self.process.exitcode, '- artifacts in', self.run_dir,
+              'are incomplete')
+
+artifacts = ArtifactWriter(ARTIFACT_MODE, RUN_DIR)
+
 # Data Preprocessing
 #
 # Problem Statement: To predict the likeliness of a patient to encounter stroke
@@ -88,10 +217,11 @@ import seaborn as sns
 # evaluate optimal result vs previous result -> Present findings via plottings
 # 
 # Load Dataset using pandas
-data = pd.read_csv('/content/healthcare-dataset-stroke-data.csv')
+DATA_PATH = '/content/healthcare-dataset-stroke-data.csv'
+data = pd.read_csv(DATA_PATH)
 
 # View first 5 rows
-data.head()
+artifacts.show(data.head())
 
 # STEP 1 (Understand and explore scope of data)
 #
@@ -153,12 +283,12 @@ pd.DataFrame(dict,index=["unique value"]).transpose()
 # View record having 'Other' as 'gender'
 # Verdicts:
 # 1) Since the count is 1, Discard this record later
-display(data[data['gender'] == 'Other'])
+artifacts.show(data[data['gender'] == 'Other'])
 
 # View record having 'children' as 'work_type'
 # Verdicts:
 # 1) There is 687 records having children, so it is not a mistype, Do Nothing about it
-display(data[data['work_type'] == 'children'])
+artifacts.show(data[data['work_type'] == 'children'])
 
 # Calculate percentage of record having 'Unknown' as 'smoking_status'
 percentage_unknown = round(data[data['smoking_status'] == 'Unknown'].shape[0]/data.shape[0]*100, 2)
@@ -171,7 +301,7 @@ print('Percentage of data Unknown as smoking_status',
 # take it as it is or replace with mode ; CANNOT DISCARD because too many records,
 # if discard, data is not accurate anymore
 # Answer: Take it as it is (Do nothing)
-display(data[data['smoking_status'] == 'Unknown'])
+artifacts.show(data[data['smoking_status'] == 'Unknown'])
 
 # Handle Capitalization and 1 record of 'Other' as 'gender'
 # Drop data
@@ -223,13 +353,11 @@ print("Number of duplicated Records: ", data.duplicated().sum())
 # Verdicts:
 # 1) Age against Stroke boxplot shows outliers
 # 2) BMI against Stroke boxplot shows outliers (dot is spread so far away when Stroke = 0)
-fig, axes = plt.subplots(nrows = 1, ncols = 3, figsize = (18, 6) , squeeze=True) # Segment subplots arranged as 1 row and 3 columns
-
-sns.boxplot(data=data, y=data['age'], x=data['stroke'], ax=axes[0]) # axes refers to column positioning when row is 1
-sns.boxplot(data=data, y=data['bmi'], x=data['stroke'], ax=axes[1])
-sns.boxplot(data=data, y=data['avg_glucose_level'], x=data['stroke'], ax=axes[2])
-
-plt.show
+artifacts.figure({'name': 'eda_boxplot_vs_stroke', 'figsize': (18, 6), 'nrows': 1, 'ncols': 3, # Segment subplots arranged as 1 row and 3 columns
+                  'data': data[['age', 'bmi', 'avg_glucose_level', 'stroke']].copy(),
+                  'panels': [{'ax': (0, 0), 'plot': 'boxplot', 'kwargs': {'y': 'age', 'x': 'stroke'}}, # ax refers to (row, column) positioning
+                             {'ax': (0, 1), 'plot': 'boxplot', 'kwargs': {'y': 'bmi', 'x': 'stroke'}},
+                             {'ax': (0, 2), 'plot': 'boxplot', 'kwargs': {'y': 'avg_glucose_level', 'x': 'stroke'}}]})
 
 # Plot histogram (Handling verdict 1: hypertension, heart_disease, and others)
 # -----------------------------------------------------
@@ -240,22 +368,15 @@ plt.show
 # Verdicts:
 # 1) There are more people w/o stroke than w/ stroke which means the data is not
 # balanced
-fig, axes = plt.subplots(nrows = 3, ncols = 3, figsize = (18, 18))
+count_columns = ['gender', 'hypertension', 'heart_disease',
+                 'ever_married', 'work_type', 'Residence_type',
+                 'smoking_status']
 
-fig.delaxes(ax=axes[2,1]) # to delete extra subplots located at row 2, col 1 & 2
-fig.delaxes(ax=axes[2,2])
-
-sns.countplot(x="gender", hue='stroke', data=data , ax=axes[0,0])
-sns.countplot(x="hypertension", hue='stroke', data=data , ax=axes[0,1])
-sns.countplot(x="heart_disease", hue='stroke', data=data , ax=axes[0,2])
-
-sns.countplot(x="ever_married", hue='stroke', data=data , ax=axes[1,0])
-sns.countplot(x="work_type", hue='stroke', data=data , ax=axes[1,1])
-sns.countplot(x="Residence_type", hue='stroke', data=data , ax=axes[1,2])
-
-sns.countplot(x="smoking_status", hue='stroke', data=data , ax=axes[2,0])
-
-plt.show()
+artifacts.figure({'name': 'eda_countplot_vs_stroke', 'figsize': (18, 18), 'nrows': 3, 'ncols': 3,
+                  'delete': [(2, 1), (2, 2)], # to delete extra subplots located at row 2, col 1 & 2
+                  'data': data[count_columns + ['stroke']].copy(),
+                  'panels': [{'ax': divmod(index, 3), 'plot': 'countplot', 'kwargs': {'x': i, 'hue': 'stroke'}}
+                             for index, i in enumerate(count_columns)]})
 
 # Plot scatterplot (Handling verdict 2: age, avg_glucose_level, bmi)
 # ----------------------------------------------------
@@ -264,31 +385,27 @@ plt.show()
 # Verdicts:
 # 1) To confirm verdicts in boxplot, BMI and age have outliers.
 # However, these are against stroke. We must confirm individually w/o stroke.
-fig, axes = plt.subplots(nrows = 1, ncols = 3, figsize = (18, 6) , squeeze=True)
-
-sns.scatterplot(data=data, x=data['stroke'], y=data['age'], ax=axes[0])
-sns.scatterplot(data=data, x=data['stroke'], y=data['bmi'], ax=axes[1] )
-sns.scatterplot(data=data, x=data['stroke'], y=data['avg_glucose_level'], ax=axes[2])
-
-plt.show
+artifacts.figure({'name': 'eda_scatterplot_vs_stroke', 'figsize': (18, 6), 'nrows': 1, 'ncols': 3,
+                  'data': data[['age', 'bmi', 'avg_glucose_level', 'stroke']].copy(),
+                  'panels': [{'ax': (0, 0), 'plot': 'scatterplot', 'kwargs': {'x': 'stroke', 'y': 'age'}},
+                             {'ax': (0, 1), 'plot': 'scatterplot', 'kwargs': {'x': 'stroke', 'y': 'bmi'}},
+                             {'ax': (0, 2), 'plot': 'scatterplot', 'kwargs': {'x': 'stroke', 'y': 'avg_glucose_level'}}]})
 
 # To Re-Confirm outliers in age and BMI
 # Plot Individual Boxplot
 # Verdicts:
 # 1) Age shows NO outliers, while BMI still shows outliers of value > 70.
 # Therefore, conduct outliers removal on BMI respectively
-fig, axes = plt.subplots(nrows = 1, ncols = 2, figsize = (10, 6) , squeeze=True)
-
-sns.boxplot(data=data, y=data['age'], ax=axes[0])
-sns.boxplot(data=data, y=data['bmi'], ax=axes[1])
-
-plt.show
+artifacts.figure({'name': 'eda_boxplot_age_bmi', 'figsize': (10, 6), 'nrows': 1, 'ncols': 2,
+                  'data': data[['age', 'bmi']].copy(),
+                  'panels': [{'ax': (0, 0), 'plot': 'boxplot', 'kwargs': {'y': 'age'}},
+                             {'ax': (0, 1), 'plot': 'boxplot', 'kwargs': {'y': 'bmi'}}]})
 
 # Display rows with 'bmi' > 70
 # Verdicts:
 # 1) It shows 4 records of outliers which is VERY SMALL to 5109 total records,
 # therefore not an issue to discard these outliers
-display(data[data['bmi'] > 70])
+artifacts.show(data[data['bmi'] > 70])
 
 # Discard outliers
 data.drop(data.index[data['bmi'] > 70], inplace = True)
@@ -298,11 +415,9 @@ data = data.reset_index(drop = True)
 
 # Checking outliers after handling outliers
 # OUTLIERS ARE GONE!!!
-plt.figure(figsize = (4,5)) # set figure size
-
-sns.boxplot(data=data, y=data['bmi'])
-
-plt.show
+artifacts.figure({'name': 'eda_boxplot_bmi_no_outliers', 'figsize': (4, 5), # set figure size
+                  'data': data[['bmi']].copy(),
+                  'panels': [{'plot': 'boxplot', 'kwargs': {'y': 'bmi'}}]})
 
 # STEP 5 (Handle missing data)
 #
@@ -329,7 +444,7 @@ data_select = data.select_dtypes(include='object')
 for i in list(data_select.columns):
     data[i] = pd.factorize(data[i])[0]
 
-data.head()
+artifacts.show(data.head())
 
 # Check encoding by viewing unique values
 # LABEL ENCODING SUCCEEDED!!!
@@ -344,7 +459,7 @@ pd.DataFrame(dict,index=["unique value"]).transpose()
 # Dropping column that is not revelant which in this case, id column is not required as it is just the number of the record.
 data = data.drop(['id'], axis = 1)
 
-data
+artifacts.show(data)
 
 # As the Target Variable (TV) is stroke, the value for this column will be saved in Y, while the others will be saved in X as Input Variable (IV)
 # Checking the correlation of the v
@@ -352,8 +467,8 @@ data
 x = data.iloc[:, 0:9] # Input Variable
 y = data.iloc[:, 10] # Target Variable
 
-print (x)
-print (y)
+artifacts.show(x)
+artifacts.show(y)
 
 # Checking the correlation of between all the variables within the dataset, but more importantly is to understand the correlation between the target variable and the input variable.
 #
@@ -366,8 +481,8 @@ data.corr()
 # Since there are no variables that contain correlation over 0.8, no column will be dropped. 
 # Based on the heatmap, the three variable that is most correlated to the target variable (stroke) are
 # age, (hypertension, heart_disease, avg_glucose_level) = same value
-plt.figure(figsize = (15, 15))
-sns.heatmap(data.corr(), annot = True)
+artifacts.figure({'name': 'correlation_heatmap', 'figsize': (15, 15),
+                  'panels': [{'plot': 'heatmap', 'kwargs': {'data': data.corr(), 'annot': True}}]})
 
 # Performing OLS Regression Result to check whether the IV and TV is related and suitable to be used as the input variable
 #
@@ -376,7 +491,7 @@ sns.heatmap(data.corr(), annot = True)
 import statsmodels.api as sm
 X = sm.add_constant(x)
 est = sm.OLS(y, X).fit()
-print (est.summary())
+artifacts.show(str(est.summary()))
 
 # Based on the OLS Regression result, we can determine that there are some input variable is not significant towards the target values 
 # since the P value for the input variable is greater than the significant value (0.05)
@@ -388,13 +503,14 @@ x.drop(columns = ['gender', 'work_type', 'Residence_type'], axis = 1, inplace =
 # the Input value will be tested in the OLS Regression Test again to check whether the IV and TV is suitable
 X = sm.add_constant(x)
 est = sm.OLS(y, X).fit()
-print (est.summary())
+artifacts.show(str(est.summary()))
 
 # STEP 8 (Perform Class Balancing)
 #
 # Class Balancing is done on the Target Variable if the target variable is not balanced.
 # Countplot is used to show the number of class amount in the stroke column.
-sns.countplot(x = y)
+artifacts.figure({'name': 'class_count_before_balancing', 'figsize': (6, 4.5), 'data': y.to_frame(),
+                  'panels': [{'plot': 'countplot', 'kwargs': {'x': 'stroke'}}]})
 
 # Based on graph, the number of patient that had stroke is significantly lower then the number of patient that does not have stroke.
 # This means that the class for Target Variable to be extremely unbalanced
@@ -407,7 +523,8 @@ sns.countplot(x = y)
 from imblearn.over_sampling import SMOTE
 x_b, y_b = SMOTE().fit_resample(x, y)
 print(y_b.value_counts())
-sns.countplot(x = y_b)
+artifacts.figure({'name': 'class_count_after_balancing', 'figsize': (6, 4.5), 'data': y_b.to_frame(),
+                  'panels': [{'plot': 'countplot', 'kwargs': {'x': 'stroke'}}]})
 
 # STEP 9 (Perform Normalization)
 #
@@ -416,7 +533,7 @@ sns.countplot(x = y_b)
 from sklearn.preprocessing import normalize
 
 x_n = normalize(x_b)
-x_n
+artifacts.show(x_n)
 
 # STEP 10 (Perform Data Splitting)
 #
@@ -453,6 +570,58 @@ class_weights = class_weight.compute_class_weight(class_weight = 'balanced',
 class_weights = {0: class_weights[0], 1: class_weights[1]}
 class_weights
 
+# Fast-Training Mode (Optional, OFF by default)
+#
+# Every sample is re-shaped into a sequence of length 1, so each LSTM layer only runs ONE recurrent step
+# per batch and most of the training time is spent on Keras' generic per-step overhead instead of maths.
+#
+# When FAST_TRAINING = True:
+# 1) LSTM layers are unrolled (no recurrent loop is built for a single timestep) and the whole train step
+# is compiled as one graph with XLA (jit_compile) so the layers get fused together
+# 2) Mixed precision is used where the hardware supports it (float16 on GPU, bfloat16 on CPU with
+# AVX512-BF16 or AMX), otherwise it stays at float32. Output Dense layer is always kept at float32
+# so that the sigmoid and binary cross entropy stay numerically stable
+# 3) Batch size is raised to FAST_BATCH_SIZE and the learning rate is scaled up linearly with it
+# (learning rate = base learning rate * batch size / BASE_BATCH_SIZE)
+#
+import tensorflow as tf
+from keras import mixed_precision, optimizers
+
+FAST_TRAINING = False
+BASE_BATCH_SIZE = 32
+FAST_BATCH_SIZE = 256
+BASE_LEARNING_RATE = 0.001 # Keras default for both Adam and RMSprop
+
+def reduced_precision_policy():
+  if tf.config.list_physical_devices('GPU'):
+    return 'mixed_float16'
+  try:
+    with open('/proc/cpuinfo') as f:
+      cpu_flags = f.read()
+  except OSError:
+    cpu_flags = ''
+  if 'avx512_bf16' in cpu_flags or 'amx_bf16' in cpu_flags:
+    return 'mixed_bfloat16'
+  return 'float32'
+
+def set_training_mode(fast):
+  # Precision policy is global, so it MUST be set before the model is built
+  mixed_precision.set_global_policy(reduced_precision_policy() if fast else 'float32')
+  return FAST_BATCH_SIZE if fast else BASE_BATCH_SIZE
+
+def scaled_learning_rate(batch_size):
+  return BASE_LEARNING_RATE * batch_size / BASE_BATCH_SIZE
+
+def scaled_optimizer(name, batch_size):
+  learning_rate = scaled_learning_rate(batch_size)
+  if name == 'rmsprop':
+    return optimizers.RMSprop(learning_rate = learning_rate)
+  return optimizers.Adam(learning_rate = learning_rate)
+
+train_batch_size = set_training_mode(FAST_TRAINING)
+print('Fast Training:', FAST_TRAINING, '| Precision Policy:', mixed_precision.global_policy().name,
+      '| Batch Size:', train_batch_size)
+
 # Select algorithm (as RNN-LSTM), Set default hyperparameters
 #
 # Model Details:
@@ -469,23 +638,25 @@ class_weights
 # 6) Loss Function: Binary Cross Entropy (Because TV is binary classification) 
 # 7) Optimizer: Adam (widely accepted default optimizer)
 # 8) Metrics: Accuracy (Because TV is binary classification)
+# (unroll, dtype and jit_compile only take effect in Fast-Training Mode)
 #
 from keras.models import Sequential
 from keras.layers import LSTM, Dense, Dropout
 
 model = Sequential()
-model.add(LSTM(units = 50, return_sequences=True, input_shape=(1, x_train.shape[2])))
+model.add(LSTM(units = 50, return_sequences=True, input_shape=(1, x_train.shape[2]), unroll = FAST_TRAINING))
 model.add(Dropout(0.2))
 
-model.add(LSTM(units = 50, return_sequences = True))
+model.add(LSTM(units = 50, return_sequences = True, unroll = FAST_TRAINING))
 model.add(Dropout(0.2))
 
-model.add(LSTM(units = 50))
+model.add(LSTM(units = 50, unroll = FAST_TRAINING))
 model.add(Dropout(0.2))
 
-model.add(Dense(units = 1, activation='sigmoid'))
+model.add(Dense(units = 1, activation='sigmoid', dtype = 'float32'))
 
-model.compile(loss='binary_crossentropy', optimizer='adam', metrics=['accuracy'])
+model.compile(loss='binary_crossentropy', optimizer=scaled_optimizer('adam', train_batch_size), metrics=['accuracy'],
+              jit_compile = FAST_TRAINING)
 
 model.summary()
 
@@ -493,23 +664,23 @@ model.summary()
 #
 # Default Model Building Parameters:
 # 9) No. of Epochs: 100 (Set at moderate-high which is widely accepted as default no. of epochs)
-# 10) Batch Size: 32 (Set on moderate-low to improve learning process and save time)
+# 10) Batch Size: 32 (Set on moderate-low to improve learning process and save time; FAST_BATCH_SIZE in Fast-Training Mode)
 # 11) Class Weight Model: set as class_weights dictionary by y_train
-history = model.fit(x_train, y_train, validation_data = (x_test, y_test), epochs=100, batch_size=32, class_weight=class_weights)
+history = model.fit(x_train, y_train, validation_data = (x_test, y_test), epochs=100, batch_size=train_batch_size, class_weight=class_weights)
 
-import matplotlib.pyplot as plt
-plt.plot(history.history['accuracy'])
-plt.plot(history.history['val_accuracy'])
-plt.title('Model Accuracy')
-plt.xlabel('Epochs')
-plt.ylabel('Accuracy')
-plt.legend(['Train', 'Test'], loc = 'upper left')
-plt.show()
+artifacts.write_json('history_model', history.history)
+
+epochs_range = list(range(len(history.history['accuracy'])))
+artifacts.figure({'name': 'accuracy_model', 'figsize': (6.4, 4.8),
+                  'panels': [{'plot': 'line', 'title': 'Model Accuracy', 'xlabel': 'Epochs', 'ylabel': 'Accuracy',
+                              'legend': True, 'legend_loc': 'upper left',
+                              'lines': [{'x': epochs_range, 'y': history.history['accuracy'], 'label': 'Train'},
+                                        {'x': epochs_range, 'y': history.history['val_accuracy'], 'label': 'Test'}]}]})
 
 # Predict x_test
 #
 predictions= model.predict(x_test)
-predictions
+artifacts.show(predictions)
 
 # View sum value of predictions and data type
 #
@@ -523,7 +694,7 @@ sum(predictions)
 #
 y_pred = (predictions > 0.5)
 
-y_pred
+artifacts.show(y_pred)
 
 # STEP 11: (Evaluate Result)
 # Evaluate Model by Accuracy, Precision, Recall and F1 Score
@@ -531,10 +702,10 @@ y_pred
 # Verdicts:
 # 1) 
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, classification_report
-print('Accuracy of MLP Classifier: ', accuracy_score(y_test, y_pred))
-print('Precision of MLP Classifier: ', precision_score(y_test, y_pred, average = 'binary'))
-print('Recall of MLP Classifier: ', recall_score(y_test, y_pred, average = 'binary'))
-print('F1 Score of MLP Classifier: ', f1_score(y_test, y_pred, average = 'binary'))
+artifacts.metrics('metrics_model', {'Accuracy': accuracy_score(y_test, y_pred),
+                                    'Precision': precision_score(y_test, y_pred, average = 'binary'),
+                                    'Recall': recall_score(y_test, y_pred, average = 'binary'),
+                                    'F1 Score': f1_score(y_test, y_pred, average = 'binary')})
 
 # View Confusion Matrix
 #
@@ -543,23 +714,24 @@ confusion_matrix(y_test, y_pred)
 
 # View Classification Report
 #
-print(classification_report(y_test, y_pred))
+artifacts.show(classification_report(y_test, y_pred))
+artifacts.write_json('classification_report_model', classification_report(y_test, y_pred, output_dict = True))
 
 # Plot ROC-AUC Diagram
 import sklearn.metrics as metrics
 FP, TP, threshold = metrics.roc_curve(y_test, y_pred)
 roc_auc = metrics.auc(FP, TP)
 
-import matplotlib.pyplot as plt
-plt.subplots(1, figsize = (7,7))
-plt.title('ROC')
-plt.plot(FP, TP, label = 'DNN_AUC = %0.2f' % roc_auc)
-plt.plot([0,1], ls = '--')
-plt.xlabel('True Positive')
-plt.ylabel('False Positive')
-plt.legend()
+artifacts.figure({'name': 'roc_model', 'figsize': (7, 7),
+                  'panels': [{'plot': 'line', 'title': 'ROC', 'xlabel': 'True Positive', 'ylabel': 'False Positive',
+                              'legend': True,
+                              'lines': [{'x': FP, 'y': TP, 'label': 'DNN_AUC = %0.2f' % roc_auc},
+                                        {'x': [0, 1], 'y': [0, 1], 'ls': '--'}]}]})
 
 # STEP 13 (Perform Optimization and HyperParameterTuning)
+#
+# Tuning searches are always run at float32 precision, regardless of Fast-Training Mode
+set_training_mode(False)
 
 from keras.models import Sequential
 from keras.layers import Dense, Dropout, Flatten
@@ -658,68 +830,561 @@ RNN_LSTM_random = RNN_LSTM_random.fit(x_train, y_train)
 print('Best Model Fitting Parameters: ', RNN_LSTM_random.best_params_)
 print('Best Score: ', RNN_LSTM_random.best_score_)
 
+# Model Backend Interface
+#
+# The train/predict steps of the Best Tuned Model (and the other backends compared in Step 15) go through
+# the same interface:
+# 1) fit(x, y, **kwargs): train with class_weights from Step 11, train time and peak memory are recorded
+# 2) predict_proba(x): probability of stroke (1) for each record of x
+# 3) model: the trained model (Keras or sklearn)
+#
+# Peak memory is the highest increase of the process resident memory (RSS) over its value before the call.
+# RSS is sampled from a background thread, so TensorFlow's own (non-Python) allocations are counted too.
+import threading
+
+def current_rss_mb():
+  with open('/proc/self/statm') as f:
+    return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+
+def measure_peak(fn, *args, **kwargs):
+  # Returns (result, time taken in s, peak RSS increase in MB)
+  baseline = current_rss_mb()
+  peak = [baseline]
+  done = threading.Event()
+
+  def sample():
+    while not done.wait(0.005):
+      peak[0] = max(peak[0], current_rss_mb())
+
+  sampler = threading.Thread(target = sample, daemon = True)
+  sampler.start()
+  start = time.perf_counter()
+  try:
+    result = fn(*args, **kwargs)
+  finally:
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+  return result, elapsed, max(peak[0], current_rss_mb()) - baseline
+
+class ModelBackend:
+  def __init__(self, name):
+    self.name = name
+    self.model = None
+
+  def fit(self, x, y, **kwargs):
+    _, self.train_time, self.train_peak_mb = measure_peak(self.fit_model, x, y, **kwargs)
+    return self
+
+class KerasLSTMBackend(ModelBackend):
+  # Accepts both 2D (records, features) and 3D (records, 1, features) x, re-shaped into 1 timestep sequences
+  def __init__(self, name, build_fn, epochs, batch_size):
+    super().__init__(name)
+    self.build_fn = build_fn
+    self.epochs = epochs
+    self.batch_size = batch_size
+
+  def fit_model(self, x, y, validation_data = None):
+    self.model = self.build_fn()
+    if validation_data is not None:
+      validation_data = (validation_data[0].reshape(len(validation_data[0]), 1, -1), validation_data[1])
+    self.history = self.model.fit(x.reshape(len(x), 1, -1), y, validation_data = validation_data, epochs=self.epochs,
+                                  batch_size=self.batch_size, class_weight=class_weights)
+
+  def predict_proba(self, x):
+    return np.asarray(self.model.predict_on_batch(x.reshape(len(x), 1, -1))).ravel()
+
 # Build Best Model
 #
-model_optimized = Sequential()
-model_optimized.add(LSTM(units = 64, return_sequences=True, input_shape=(1, x_train.shape[2])))
-model_optimized.add(Dropout(0.2))
+def build_model_optimized(fast, batch_size):
+  model_optimized = Sequential()
+  model_optimized.add(LSTM(units = 64, return_sequences=True, input_shape=(1, x_train.shape[2]), unroll = fast))
+  model_optimized.add(Dropout(0.2))
 
-model_optimized.add(LSTM(units = 416, return_sequences = True))
-model_optimized.add(Dropout(0.1))
+  model_optimized.add(LSTM(units = 416, return_sequences = True, unroll = fast))
+  model_optimized.add(Dropout(0.1))
 
-model_optimized.add(LSTM(units = 416, return_sequences = True))
-model_optimized.add(Dropout(0.1))
+  model_optimized.add(LSTM(units = 416, return_sequences = True, unroll = fast))
+  model_optimized.add(Dropout(0.1))
 
-model_optimized.add(LSTM(units = 64))
-model_optimized.add(Dropout(0.0))
+  model_optimized.add(LSTM(units = 64, unroll = fast))
+  model_optimized.add(Dropout(0.0))
 
-model_optimized.add(Dense(units = 1, activation='sigmoid'))
+  model_optimized.add(Dense(units = 1, activation='sigmoid', dtype = 'float32'))
 
-model_optimized.compile(loss='binary_crossentropy', optimizer='rmsprop', metrics=['accuracy'])
+  model_optimized.compile(loss='binary_crossentropy', optimizer=scaled_optimizer('rmsprop', batch_size),
+                          metrics=['accuracy'], jit_compile = fast)
+  return model_optimized
 
-model_optimized.summary()
+train_batch_size = set_training_mode(FAST_TRAINING)
+
+lstm_backend = KerasLSTMBackend('RNN-LSTM', lambda: build_model_optimized(FAST_TRAINING, train_batch_size),
+                                epochs = 250, batch_size = train_batch_size)
 
 # Train Best Tuned Model
 #
-history_optimized = model_optimized.fit(x_train, y_train, validation_data = (x_test, y_test),
-                                        epochs=250, batch_size=32, class_weight=class_weights)
+lstm_backend.fit(x_train, y_train, validation_data = (x_test, y_test))
+
+model_optimized = lstm_backend.model
+history_optimized = lstm_backend.history
+
+model_optimized.summary()
 
-plt.plot(history_optimized.history['accuracy'])
-plt.plot(history_optimized.history['val_accuracy'])
-plt.title('Optimized Model Accuracy')
-plt.xlabel('Epochs')
-plt.ylabel('Accuracy')
-plt.legend(['Train', 'Test'], loc = 'upper left')
-plt.show()
+artifacts.write_json('history_model_optimized', history_optimized.history)
+
+epochs_range = list(range(len(history_optimized.history['accuracy'])))
+artifacts.figure({'name': 'accuracy_model_optimized', 'figsize': (6.4, 4.8),
+                  'panels': [{'plot': 'line', 'title': 'Optimized Model Accuracy', 'xlabel': 'Epochs', 'ylabel': 'Accuracy',
+                              'legend': True, 'legend_loc': 'upper left',
+                              'lines': [{'x': epochs_range, 'y': history_optimized.history['accuracy'], 'label': 'Train'},
+                                        {'x': epochs_range, 'y': history_optimized.history['val_accuracy'], 'label': 'Test'}]}]})
 
 # Predict x_test
 #
-predictions_optimized= model_optimized.predict(x_test)
-predictions_optimized
+predictions_optimized= lstm_backend.predict_proba(x_test)
+artifacts.show(predictions_optimized)
 
 y_pred_optimized = (predictions_optimized > 0.5)
 
-y_pred_optimized
+artifacts.show(y_pred_optimized)
 
-print('Accuracy of MLP Classifier: ', accuracy_score(y_test, y_pred_optimized))
-print('Precision of MLP Classifier: ', precision_score(y_test, y_pred_optimized, average = 'binary'))
-print('Recall of MLP Classifier: ', recall_score(y_test, y_pred_optimized, average = 'binary'))
-print('F1 Score of MLP Classifier: ', f1_score(y_test, y_pred_optimized, average = 'binary'))
+artifacts.metrics('metrics_model_optimized', {'Accuracy': accuracy_score(y_test, y_pred_optimized),
+                                              'Precision': precision_score(y_test, y_pred_optimized, average = 'binary'),
+                                              'Recall': recall_score(y_test, y_pred_optimized, average = 'binary'),
+                                              'F1 Score': f1_score(y_test, y_pred_optimized, average = 'binary')})
 
 confusion_matrix(y_test, y_pred_optimized)
 
-print(classification_report(y_test, y_pred_optimized))
+artifacts.show(classification_report(y_test, y_pred_optimized))
+artifacts.write_json('classification_report_model_optimized',
+                     classification_report(y_test, y_pred_optimized, output_dict = True))
 
 # Plot ROC-AUC Diagram
 import sklearn.metrics as metrics
 FP, TP, threshold = metrics.roc_curve(y_test, y_pred_optimized)
 roc_auc = metrics.auc(FP, TP)
 
-import matplotlib.pyplot as plt
-plt.subplots(1, figsize = (7,7))
-plt.title('ROC')
-plt.plot(FP, TP, label = 'DNN_AUC = %0.2f' % roc_auc)
-plt.plot([0,1], ls = '--')
-plt.xlabel('True Positive')
-plt.ylabel('False Positive')
-plt.legend()
+artifacts.figure({'name': 'roc_model_optimized', 'figsize': (7, 7),
+                  'panels': [{'plot': 'line', 'title': 'ROC', 'xlabel': 'True Positive', 'ylabel': 'False Positive',
+                              'legend': True,
+                              'lines': [{'x': FP, 'y': TP, 'label': 'DNN_AUC = %0.2f' % roc_auc},
+                                        {'x': [0, 1], 'y': [0, 1], 'ls': '--'}]}]})
+
+
+# Benchmark Fast-Training Mode against the current configuration
+#
+# Both modes train the Best Tuned Model architecture on the same train/test split for BENCHMARK_EPOCHS epochs.
+# One short warm-up fit is done first so that graph tracing and XLA compilation are not counted as training time.
+# The warm-up uses the same class weights and covers both a full batch and the last partial batch
+# (no. of training samples % batch size), so that the timed fit does not trigger any re-trace or re-compile.
+#
+# Reported:
+# 1) Samples/s: training throughput (no. of epochs * no. of training samples / training time)
+# 2) F1 Score: on x_test after training
+BENCHMARK_EPOCHS = 20
+
+benchmark = {}
+for mode_name, fast in [('Current', False), ('Fast-Training', True)]:
+  batch_size = set_training_mode(fast)
+  model_bm = build_model_optimized(fast, batch_size)
+  warm_up_size = batch_size + len(x_train) % batch_size
+  model_bm.fit(x_train[:warm_up_size], y_train.iloc[:warm_up_size], epochs=1, batch_size=batch_size,
+               class_weight=class_weights, verbose=0)
+
+  start = time.perf_counter()
+  model_bm.fit(x_train, y_train, epochs=BENCHMARK_EPOCHS, batch_size=batch_size, class_weight=class_weights, verbose=0)
+  train_time = time.perf_counter() - start
+
+  y_pred_bm = (model_bm.predict(x_test, verbose=0) > 0.5)
+  benchmark[mode_name] = {'Precision Policy': mixed_precision.global_policy().name,
+                          'Batch Size': batch_size,
+                          'Learning Rate': scaled_learning_rate(batch_size),
+                          'Training Time (s)': round(train_time, 2),
+                          'Samples/s': round(BENCHMARK_EPOCHS * len(x_train) / train_time),
+                          'F1 Score': round(f1_score(y_test, y_pred_bm, average = 'binary'), 4)}
+
+set_training_mode(FAST_TRAINING)
+artifacts.write_json('fast_training_benchmark', benchmark)
+artifacts.show(pd.DataFrame(benchmark))
+
+
+# STEP 14 (Monitor Incoming Scoring Traffic)
+#
+# The cleaning rules in Step 2 - 5 were decided from ONE offline look at this 5110 records file:
+# 1) 1 record of 'Other' as 'gender' (discarded)
+# 2) 4 records of 'bmi' > 70 (discarded as outliers)
+# 3) 3.94% of missing 'bmi' (imputed with mean)
+# 4) 30.22% of 'Unknown' as 'smoking_status' (kept as it is)
+# Nothing checks whether incoming scoring data still looks like this. Therefore, a monitor is kept on the raw
+# (uncleaned) records of every scored batch and compared against a training profile saved from this file.
+#
+# Memory stays CONSTANT no matter how many records flow through, because each feature only keeps counters:
+# 1) Numerical: fixed-bin histogram (bin edges = training 5% quantiles), null count, record count, sum, min, max
+# 2) Categorical: 1 count per training category + 1 count for unseen categories, null count, record count
+# 3) Cleaning rules: 1 count per rule
+# Since everything is a counter, sketches from different batches or scoring workers are merged by adding them up,
+# and the training profile is just a sketch filled with the training data and saved as JSON.
+# Each update is 1 vectorized numpy/pandas call per feature per batch, so it adds negligible latency to scoring.
+#
+# Drift alert rules (only raised once MONITOR_MIN_RECORDS have been seen):
+# 1) Population Stability Index (PSI) of bins/categories > 0.2 (< 0.1 no shift, 0.1 - 0.2 moderate, > 0.2 significant)
+# 2) Null rate moved by more than 5 percentage points from training
+# 3) Unseen categories are more than 1% of records
+# 4) Rate of a cleaning rule moved by more than 1 percentage point from training
+MONITOR_NUMERICAL = ['age', 'avg_glucose_level', 'bmi']
+MONITOR_CATEGORICAL = ['gender', 'hypertension', 'heart_disease', 'ever_married',
+                       'work_type', 'Residence_type', 'smoking_status']
+# (astype('string') keeps nulls as <NA>, so a column which is entirely null in a batch does not break .str)
+CLEANING_RULES = {"gender == 'other'": lambda df: df['gender'].astype('string').str.lower() == 'other',
+                  'bmi > 70': lambda df: pd.to_numeric(df['bmi'], errors = 'coerce') > 70,
+                  'bmi is missing': lambda df: df['bmi'].isnull(),
+                  "smoking_status == 'unknown'": lambda df: df['smoking_status'].astype('string').str.lower() == 'unknown'}
+
+MONITOR_MIN_RECORDS = 500
+PSI_THRESHOLD = 0.2
+NULL_RATE_TOLERANCE = 0.05
+UNSEEN_RATE_THRESHOLD = 0.01
+RULE_RATE_TOLERANCE = 0.01
+
+def population_stability_index(expected_counts, actual_counts, epsilon = 1e-4):
+  expected = np.clip(expected_counts / max(expected_counts.sum(), 1), epsilon, None)
+  actual = np.clip(actual_counts / max(actual_counts.sum(), 1), epsilon, None)
+  return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+class NumericalSketch:
+  def __init__(self, edges):
+    self.edges = np.asarray(edges, dtype = float) # inner bin edges, first and last bin are open-ended
+    self.bins = np.zeros(len(self.edges) + 1, dtype = np.int64)
+    self.count = 0
+    self.nulls = 0
+    self.total = 0.0
+    self.min = np.inf
+    self.max = -np.inf
+
+  def update(self, values):
+    values = pd.to_numeric(values, errors = 'coerce').to_numpy(dtype = float)
+    missing = np.isnan(values)
+    present = values[~missing]
+    self.count += len(values)
+    self.nulls += int(missing.sum())
+    if len(present):
+      self.bins += np.bincount(np.searchsorted(self.edges, present, side = 'right'), minlength = len(self.bins))
+      self.total += float(present.sum())
+      self.min = min(self.min, float(present.min()))
+      self.max = max(self.max, float(present.max()))
+
+  def merge(self, other):
+    self.bins += other.bins
+    self.count += other.count
+    self.nulls += other.nulls
+    self.total += other.total
+    self.min = min(self.min, other.min)
+    self.max = max(self.max, other.max)
+
+  def quantile(self, q):
+    # Approximate quantile: find the bin holding q, then interpolate linearly inside it
+    # (the open-ended first and last bins are bounded by the running min and max)
+    present = self.bins.sum()
+    if present == 0:
+      return np.nan
+    # (bounds are clamped to the observed range, so traffic sitting in a tail bin is not stretched to the training edge)
+    bounds = np.clip(np.concatenate([[self.min], self.edges, [self.max]]), self.min, self.max)
+    cumulative = np.cumsum(self.bins) / present
+    i = int(np.searchsorted(cumulative, q))
+    previous = cumulative[i - 1] if i > 0 else 0.0
+    fraction = (q - previous) / (cumulative[i] - previous)
+    return float(bounds[i] + fraction * (bounds[i + 1] - bounds[i]))
+
+  def to_dict(self):
+    return {'edges': self.edges.tolist(), 'bins': self.bins.tolist(), 'count': self.count, 'nulls': self.nulls,
+            'total': self.total, 'min': self.min, 'max': self.max}
+
+  @classmethod
+  def from_dict(cls, d, empty = False):
+    sketch = cls(d['edges'])
+    if not empty:
+      sketch.bins = np.asarray(d['bins'], dtype = np.int64)
+      sketch.count, sketch.nulls, sketch.total, sketch.min, sketch.max = d['count'], d['nulls'], d['total'], d['min'], d['max']
+    return sketch
+
+def normalize_category(value):
+  # Same standardization as Step 2: categories are compared in lowercase.
+  # Whole numbers (e.g: hypertension) are put in integer form, because 1 null or 1 bad value (e.g: 0.5) in a batch
+  # turns the whole column into float and '1' would become '1.0'. Done per value, so that 1 bad value
+  # (which stays as '0.5') is counted as 1 unseen record instead of making the whole batch unseen
+  if isinstance(value, (int, float, np.integer, np.floating)) and float(value).is_integer():
+    return str(int(value))
+  return str(value).lower()
+
+def normalize_categories(values):
+  return values.dropna().map(normalize_category)
+
+class CategoricalSketch:
+  def __init__(self, categories):
+    self.categories = list(categories)
+    self.counts = np.zeros(len(self.categories) + 1, dtype = np.int64) # last count is for unseen categories
+    self.count = 0
+    self.nulls = 0
+
+  def update(self, values):
+    codes = pd.Index(self.categories).get_indexer(normalize_categories(values)) # -1 for unseen categories
+    self.count += len(values)
+    self.nulls += int(values.isnull().sum())
+    self.counts[:-1] += np.bincount(codes[codes >= 0], minlength = len(self.categories))
+    self.counts[-1] += int((codes < 0).sum())
+
+  def merge(self, other):
+    self.counts += other.counts
+    self.count += other.count
+    self.nulls += other.nulls
+
+  def to_dict(self):
+    return {'categories': self.categories, 'counts': self.counts.tolist(), 'count': self.count, 'nulls': self.nulls}
+
+  @classmethod
+  def from_dict(cls, d, empty = False):
+    sketch = cls(d['categories'])
+    if not empty:
+      sketch.counts = np.asarray(d['counts'], dtype = np.int64)
+      sketch.count, sketch.nulls = d['count'], d['nulls']
+    return sketch
+
+class StreamingDriftMonitor:
+  def __init__(self, numerical, categorical):
+    self.numerical = numerical
+    self.categorical = categorical
+    self.rule_counts = dict.fromkeys(CLEANING_RULES, 0)
+    self.records = 0
+
+  @classmethod
+  def from_training_data(cls, df, n_bins = 20):
+    numerical = {}
+    for col in MONITOR_NUMERICAL:
+      edges = np.unique(np.nanquantile(pd.to_numeric(df[col], errors = 'coerce'), np.linspace(0, 1, n_bins + 1)[1:-1]))
+      numerical[col] = NumericalSketch(edges)
+    categorical = {col: CategoricalSketch(sorted(normalize_categories(df[col]).unique()))
+                   for col in MONITOR_CATEGORICAL}
+    monitor = cls(numerical, categorical)
+    monitor.update(df)
+    return monitor
+
+  @classmethod
+  def from_profile(cls, profile, empty = True):
+    # empty = True gives a fresh monitor with the same bins/categories as the training profile
+    monitor = cls({col: NumericalSketch.from_dict(d, empty) for col, d in profile['numerical'].items()},
+                  {col: CategoricalSketch.from_dict(d, empty) for col, d in profile['categorical'].items()})
+    if not empty:
+      monitor.rule_counts = dict(profile['rule_counts'])
+      monitor.records = profile['records']
+    return monitor
+
+  def update(self, batch):
+    for col, sketch in self.numerical.items():
+      sketch.update(batch[col])
+    for col, sketch in self.categorical.items():
+      sketch.update(batch[col])
+    for rule, condition in CLEANING_RULES.items():
+      self.rule_counts[rule] += int(condition(batch).sum())
+    self.records += len(batch)
+
+  def merge(self, other):
+    for col, sketch in self.numerical.items():
+      sketch.merge(other.numerical[col])
+    for col, sketch in self.categorical.items():
+      sketch.merge(other.categorical[col])
+    for rule in self.rule_counts:
+      self.rule_counts[rule] += other.rule_counts[rule]
+    self.records += other.records
+
+  def to_profile(self):
+    return {'numerical': {col: sketch.to_dict() for col, sketch in self.numerical.items()},
+            'categorical': {col: sketch.to_dict() for col, sketch in self.categorical.items()},
+            'rule_counts': self.rule_counts, 'records': self.records}
+
+  def check(self, training):
+    # Compare this (live) monitor against the training monitor, 1 row per feature/rule
+    report = {}
+    for col, sketch in self.numerical.items():
+      train = training.numerical[col]
+      report[col] = {'PSI': population_stability_index(train.bins, sketch.bins),
+                     'Train Null Rate': train.nulls / max(train.count, 1),
+                     'Live Null Rate': sketch.nulls / max(sketch.count, 1),
+                     'Unseen Rate': np.nan,
+                     'Train Median': train.quantile(0.5),
+                     'Live Median': sketch.quantile(0.5)}
+    for col, sketch in self.categorical.items():
+      train = training.categorical[col]
+      report[col] = {'PSI': population_stability_index(train.counts, sketch.counts),
+                     'Train Null Rate': train.nulls / max(train.count, 1),
+                     'Live Null Rate': sketch.nulls / max(sketch.count, 1),
+                     'Unseen Rate': sketch.counts[-1] / max(sketch.count, 1)}
+    for rule, count in self.rule_counts.items():
+      report[rule] = {'Train Rule Rate': training.rule_counts[rule] / max(training.records, 1),
+                      'Live Rule Rate': count / max(self.records, 1)}
+
+    report = pd.DataFrame(report).transpose()
+    alerts = pd.Series('', index = report.index)
+    if self.records >= MONITOR_MIN_RECORDS:
+      alerts[report['PSI'] > PSI_THRESHOLD] += 'distribution shift; '
+      alerts[(report['Live Null Rate'] - report['Train Null Rate']).abs() > NULL_RATE_TOLERANCE] += 'null rate; '
+      alerts[report['Unseen Rate'] > UNSEEN_RATE_THRESHOLD] += 'unseen categories; '
+      alerts[(report['Live Rule Rate'] - report['Train Rule Rate']).abs() > RULE_RATE_TOLERANCE] += 'cleaning rule rate; '
+    report['Alert'] = alerts.str.rstrip('; ')
+    return report
+
+# Build and save the training profile from the raw (uncleaned) file, same as what scoring traffic looks like
+training_monitor = StreamingDriftMonitor.from_training_data(pd.read_csv(DATA_PATH))
+with open('training_profile.json', 'w') as f:
+  json.dump(training_monitor.to_profile(), f)
+
+# Scoring side: load the saved profile and start an empty monitor with the same bins/categories
+with open('training_profile.json') as f:
+  training_profile = json.load(f)
+training_monitor = StreamingDriftMonitor.from_profile(training_profile, empty = False)
+live_monitor = StreamingDriftMonitor.from_profile(training_profile)
+
+# Simulate scoring traffic in batches of 256 records and time the monitor against model prediction
+# Verdicts:
+# 1) Traffic is the same file as training, so NO alerts are expected
+# 2) Monitor update time per batch should be negligible compared to predicting the same batch
+SCORING_BATCH_SIZE = 256
+scoring_traffic = pd.read_csv(DATA_PATH)
+
+monitor_time = 0.0
+for start in range(0, len(scoring_traffic), SCORING_BATCH_SIZE):
+  batch = scoring_traffic.iloc[start:start + SCORING_BATCH_SIZE]
+  t0 = time.perf_counter()
+  live_monitor.update(batch)
+  monitor_time += time.perf_counter() - t0
+n_batches = int(np.ceil(len(scoring_traffic) / SCORING_BATCH_SIZE))
+
+# Warm up once so that tracing is not counted, then average prediction over the same no. of batches
+model_optimized.predict_on_batch(x_test[:SCORING_BATCH_SIZE])
+predict_time = 0.0
+for i in range(n_batches):
+  t0 = time.perf_counter()
+  model_optimized.predict_on_batch(x_test[:SCORING_BATCH_SIZE])
+  predict_time += time.perf_counter() - t0
+
+print('Monitor update per batch: %.2f ms' % (monitor_time / n_batches * 1000))
+print('Model prediction per batch: %.2f ms' % (predict_time / n_batches * 1000))
+drift_report = live_monitor.check(training_monitor)
+artifacts.write_json('drift_report', drift_report.to_dict(orient = 'index'))
+artifacts.show(drift_report)
+
+# Simulate drifted traffic from 2 scoring workers, then merge their monitors
+# Verdicts:
+# 1) Worker 2 receives more missing 'bmi' and more 'Unknown' smoking_status, so alerts are expected on
+# 'bmi', 'smoking_status' and their cleaning rules after merging
+worker_1 = StreamingDriftMonitor.from_profile(training_profile)
+worker_2 = StreamingDriftMonitor.from_profile(training_profile)
+
+drifted_traffic = scoring_traffic.sample(frac = 1, random_state = 2).reset_index(drop = True)
+half = len(drifted_traffic) // 2
+drifted_traffic.loc[half:half + 600, 'bmi'] = np.nan
+drifted_traffic.loc[half + 600:, 'smoking_status'] = 'Unknown'
+
+worker_1.update(drifted_traffic.iloc[:half])
+worker_2.update(drifted_traffic.iloc[half:])
+worker_1.merge(worker_2)
+merged_drift_report = worker_1.check(training_monitor)
+artifacts.write_json('drift_report_merged_workers', merged_drift_report.to_dict(orient = 'index'))
+artifacts.show(merged_drift_report)
+
+
+# STEP 15 (Compare Model Backends)
+#
+# Each patient is ONE static record which is only wrapped as a 1 timestep sequence for the LSTM layers,
+# so the recurrent architecture adds compute without making use of any temporal structure.
+#
+# Model backends share the same interface as the Best Tuned Model in Step 13 (see Model Backend Interface).
+#
+# Backends compared:
+# 1) RNN-LSTM: Best Tuned Model already trained in Step 13 (reused, NOT trained again)
+# 2) Histogram Gradient Boosting: tree ensemble on binned features, fully vectorized
+# 3) Logistic Regression: linear baseline
+# All backends use the same selected features (Step 7), class balancing (Step 8), normalization (Step 9),
+# train/test split (Step 10) and class weights (Step 11).
+import pickle
+from sklearn.base import clone
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+
+class SklearnBackend(ModelBackend):
+  def __init__(self, name, estimator):
+    super().__init__(name)
+    self.estimator = estimator
+
+  def fit_model(self, x, y):
+    sample_weight = np.asarray(y).astype(int)
+    sample_weight = np.where(sample_weight == 1, class_weights[1], class_weights[0])
+    self.model = clone(self.estimator).fit(x, y, sample_weight=sample_weight)
+
+  def predict_proba(self, x):
+    return self.model.predict_proba(x)[:, 1]
+
+# Comparison Harness
+#
+# Reported for each backend (all on the same train/test split):
+# 1) Train Time (s) (for RNN-LSTM, it includes the per-epoch validation on x_test done in Step 13)
+# 2) Peak Train Memory (MB): peak RSS increase during training
+# 3) Per-Row Latency (ms): median time to predict 1 record per call (as a scoring request would)
+# 4) Batched Latency (ms/row): time to predict the whole x_test in 1 call, divided by no. of records
+# 5) Peak Batched Predict Memory (MB): peak RSS increase while predicting the whole x_test in 1 call
+# 6) Serialized Size (KB): size of the pickled trained model
+# 7) Recall and F1 Score on x_test (threshold 0.5, same as Step 11)
+# Backends which are already trained (e.g: RNN-LSTM from Step 13) are reused with their recorded train time and memory.
+def compare_backends(backends, x_train, y_train, x_test, y_test, latency_rows = 200):
+  results = {}
+  for backend in backends:
+    if backend.model is None:
+      backend.fit(x_train, y_train)
+
+    backend.predict_proba(x_test[:1]) # warm-up
+    row_times = []
+    for row in x_test[:latency_rows]:
+      t0 = time.perf_counter()
+      backend.predict_proba(row.reshape(1, -1))
+      row_times.append(time.perf_counter() - t0)
+
+    proba, batched_time, predict_peak_mb = measure_peak(backend.predict_proba, x_test)
+    y_pred_backend = (proba > 0.5)
+
+    results[backend.name] = {'Train Time (s)': backend.train_time,
+                             'Peak Train Memory (MB)': backend.train_peak_mb,
+                             'Per-Row Latency (ms)': np.median(row_times) * 1000,
+                             'Batched Latency (ms/row)': batched_time / len(x_test) * 1000,
+                             'Peak Batched Predict Memory (MB)': predict_peak_mb,
+                             'Serialized Size (KB)': len(pickle.dumps(backend.model)) / 1024,
+                             'Recall': recall_score(y_test, y_pred_backend, average = 'binary'),
+                             'F1 Score': f1_score(y_test, y_pred_backend, average = 'binary')}
+  return pd.DataFrame(results).transpose()
+
+backends = [lstm_backend,
+            SklearnBackend('Histogram Gradient Boosting', HistGradientBoostingClassifier(random_state = 2)),
+            SklearnBackend('Logistic Regression', LogisticRegression(max_iter = 1000))]
+
+# x_train and x_test were re-shaped into 1 timestep sequences in Step 11, flatten back to (records, features)
+x_train_2d = x_train.reshape(len(x_train), -1)
+x_test_2d = x_test.reshape(len(x_test), -1)
+
+backend_report = compare_backends(backends, x_train_2d, y_train, x_test_2d, y_test)
+artifacts.write_json('backend_report', backend_report.to_dict(orient = 'index'))
+artifacts.show(backend_report.round(4))
+
+# Select Backend to Serve
+#
+# The cheapest backend (lowest per-row latency) which still meets RECALL_TARGET is served,
+# since missing a patient likely to get stroke (False Negative) is the costly mistake here
+RECALL_TARGET = 0.9
+
+eligible = backend_report[backend_report['Recall'] >= RECALL_TARGET]
+if len(eligible):
+  served_backend = {backend.name: backend for backend in backends}[eligible['Per-Row Latency (ms)'].idxmin()]
+  print('Backend to serve:', served_backend.name)
+else:
+  served_backend = None
+  print('No backend meets the recall target of', RECALL_TARGET)
+
+# Wait for the artifact writer to finish writing every figure and JSON into RUN_DIR
+artifacts.close()